@@ -1,13 +1,20 @@
 import os
+import hmac
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
-from utils.predict import load_model_and_predict, get_supported_classes, validate_model
-from flask_cors import CORS # Import CORS
 
-# Load environment variables from .env
+# Load environment variables from .env before importing utils, which read
+# settings such as MODEL_PATH and INFERENCE_SOCKET at import time
 load_dotenv()
 
+from utils.predict import load_model_and_predict, get_supported_classes, validate_model
+from utils.profiling import start_profiling, stop_profiling, get_profiling_status, profile_request, ProfilingActiveError
+from flask_cors import CORS # Import CORS
+
 app = Flask(__name__)
+
+# Token required for /admin endpoints; admin endpoints are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 # Initialize CORS with your Flask app
 CORS(app, resources={
     r"/*": {
@@ -62,7 +69,8 @@ def predict():
             return response
         
         # Make prediction
-        result = load_model_and_predict(img_file)
+        with profile_request():
+            result = load_model_and_predict(img_file)
         
         return jsonify({
             "success": True,
@@ -165,6 +173,61 @@ def test_predict():
         response.status_code = 500
         return response
 
+def is_admin_request():
+    """Check the request carries 'Authorization: Bearer <ADMIN_TOKEN>'"""
+    if not ADMIN_TOKEN:
+        return False
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return False
+    # Compare bytes: compare_digest rejects non-ASCII str. Headers are decoded as
+    # latin-1, so re-encoding that way recovers the raw bytes that were sent
+    token = auth_header[len("Bearer "):].encode("latin-1", "replace")
+    return hmac.compare_digest(token, ADMIN_TOKEN.encode())
+
+@app.route("/admin/profile", methods=["GET", "POST", "DELETE"])
+def admin_profile():
+    """Admin-only: start (POST), inspect (GET) or stop (DELETE) inference profiling"""
+    if not is_admin_request():
+        response = jsonify({"error": "Forbidden"})
+        response.status_code = 403
+        return response
+
+    try:
+        if request.method == "POST":
+            options = request.get_json(silent=True) or {}
+            if not isinstance(options, dict):
+                raise ValueError("Request body must be a JSON object")
+            session = start_profiling(
+                mode=options.get("mode", "sample"),
+                requests=options.get("requests"),
+                seconds=options.get("seconds")
+            )
+            return jsonify({"success": True, "session": session})
+
+        if request.method == "DELETE":
+            result = stop_profiling()
+            return jsonify({"success": True, "pid": os.getpid(), "result": result})
+
+        return jsonify({"success": True, **get_profiling_status()})
+
+    except ProfilingActiveError as e:
+        response = jsonify({"success": False, "error": str(e)})
+        response.status_code = 409
+        return response
+    except ValueError as e:
+        response = jsonify({"success": False, "error": str(e)})
+        response.status_code = 400
+        return response
+    except Exception as e:
+        app.logger.error("Error controlling profiler: %s", str(e), exc_info=True)
+        response = jsonify({
+            "success": False,
+            "error": f"Profiling failed: {str(e)}"
+        })
+        response.status_code = 500
+        return response
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))  # Use PORT from environment or default to 5000
     debug_mode = os.getenv("FLASK_DEBUG", "False").lower() == "true"
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Accuracy/throughput regression harness for model artifacts
+
+Runs a labelled image set through the serving preprocessing and compares
+one or more model artifacts (.h5, SavedModel directory, .tflite).
+
+Image set layout (same as the training data):
+    <data_dir>/<class_name>/<image files>
+
+Usage:
+    python benchmark_models.py <data_dir> model/plant_disease_model.h5 model/plant_disease_model.tflite
+
+The first artifact is the baseline; the script exits with status 1 if any
+candidate regresses past the configured thresholds.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_dataset(data_dir, class_names, limit_per_class=None):
+    """Collect (path, class_index) pairs from <data_dir>/<class_name>/ folders"""
+    samples = []
+    for class_name in sorted(os.listdir(data_dir)):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        if class_name not in class_names:
+            print(f"   Skipping unknown class folder: {class_name}")
+            continue
+
+        files = sorted(
+            f for f in os.listdir(class_dir)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if limit_per_class:
+            files = files[:limit_per_class]
+        class_index = class_names.index(class_name)
+        samples.extend((os.path.join(class_dir, f), class_index) for f in files)
+
+    return samples
+
+
+def load_artifact(model_path):
+    """Return a predict function mapping a preprocessed batch to class probabilities"""
+    import tensorflow as tf
+
+    if model_path.endswith('.tflite'):
+        interpreter = tf.lite.Interpreter(model_path=model_path)
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+
+        def predict(img_array):
+            data = img_array
+            if input_details['dtype'] != np.float32:
+                scale, zero_point = input_details['quantization']
+                limits = np.iinfo(input_details['dtype'])
+                # Clip so out-of-range values saturate instead of wrapping on the cast
+                data = np.clip(np.round(img_array / scale + zero_point), limits.min, limits.max)
+            interpreter.set_tensor(input_details['index'], data.astype(input_details['dtype']))
+            interpreter.invoke()
+            output = interpreter.get_tensor(output_details['index'])[0]
+            if output_details['dtype'] != np.float32:
+                scale, zero_point = output_details['quantization']
+                output = (output.astype(np.float32) - zero_point) * scale
+            return output
+
+        return predict
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    def predict(img_array):
+        # Same call as utils.predict.load_model_and_predict
+        return model.predict(img_array, verbose=0)[0]
+
+    return predict
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def evaluate_artifact(model_path, samples, num_classes, warmup, repeats=1):
+    """
+    Run every sample through serving preprocessing and the model, collecting metrics.
+    Accuracy comes from the first pass; speed metrics are the median over `repeats` passes.
+    """
+    from utils.predict import preprocess_image
+
+    predict = load_artifact(model_path)
+
+    for path, _ in samples[:warmup]:
+        with open(path, 'rb') as img_file:
+            predict(preprocess_image(img_file))
+
+    confusion = np.zeros((num_classes, num_classes), dtype=np.int64)
+    top3_correct = 0
+    passes = []
+
+    for run in range(repeats):
+        latencies = []
+        start = time.perf_counter()
+        for path, class_index in samples:
+            request_start = time.perf_counter()
+            with open(path, 'rb') as img_file:
+                predictions = predict(preprocess_image(img_file))
+            latencies.append(time.perf_counter() - request_start)
+
+            if run == 0:
+                predicted = int(np.argmax(predictions))
+                confusion[class_index, predicted] += 1
+                if class_index in np.argsort(predictions)[-3:]:
+                    top3_correct += 1
+        elapsed = time.perf_counter() - start
+
+        latencies_ms = np.array(latencies) * 1000
+        passes.append({
+            "images_per_sec": len(samples) / elapsed,
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "p99_ms": float(np.percentile(latencies_ms, 99))
+        })
+
+    result = {
+        "artifact": model_path,
+        "images": len(samples),
+        "repeats": repeats,
+        "top1": float(np.trace(confusion) / len(samples)),
+        "top3": top3_correct / len(samples),
+        "peak_memory_mb": peak_memory_mb(),
+        "confusion": confusion.tolist()
+    }
+    for metric in ("images_per_sec", "p50_ms", "p95_ms", "p99_ms"):
+        result[metric] = float(np.median([p[metric] for p in passes]))
+    return result
+
+
+def run_isolated(model_path, samples, num_classes, warmup, repeats):
+    """Evaluate in a fresh process so peak memory and TF state are per artifact"""
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(evaluate_artifact, (model_path, samples, num_classes, warmup, repeats))
+
+
+def check_regressions(baseline, candidate, args):
+    """Return a list of threshold violations of candidate against baseline"""
+    failures = []
+
+    top1_drop = baseline["top1"] - candidate["top1"]
+    if top1_drop > args.max_top1_drop:
+        failures.append(f"top-1 accuracy dropped by {top1_drop:.2%} (max {args.max_top1_drop:.2%})")
+
+    top3_drop = baseline["top3"] - candidate["top3"]
+    if top3_drop > args.max_top3_drop:
+        failures.append(f"top-3 accuracy dropped by {top3_drop:.2%} (max {args.max_top3_drop:.2%})")
+
+    throughput_drop = 1 - candidate["images_per_sec"] / baseline["images_per_sec"]
+    if throughput_drop > args.max_throughput_drop:
+        failures.append(f"throughput dropped by {throughput_drop:.1%} (max {args.max_throughput_drop:.1%})")
+
+    latency_increase = candidate["p95_ms"] / baseline["p95_ms"] - 1
+    if latency_increase > args.max_latency_increase:
+        failures.append(f"p95 latency increased by {latency_increase:.1%} (max {args.max_latency_increase:.1%})")
+
+    if baseline["peak_memory_mb"] and candidate["peak_memory_mb"]:
+        memory_increase = candidate["peak_memory_mb"] / baseline["peak_memory_mb"] - 1
+        if memory_increase > args.max_memory_increase:
+            failures.append(f"peak memory increased by {memory_increase:.1%} (max {args.max_memory_increase:.1%})")
+
+    return failures
+
+
+def print_comparison(results):
+    """Print the per-artifact comparison table"""
+    header = f"{'artifact':<40} {'top1':>7} {'top3':>7} {'img/s':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'peakMB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        memory = f"{r['peak_memory_mb']:.0f}" if r['peak_memory_mb'] else "n/a"
+        print(
+            f"{os.path.basename(r['artifact'].rstrip(os.sep)):<40} {r['top1']:>7.2%} {r['top3']:>7.2%} "
+            f"{r['images_per_sec']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {memory:>8}"
+        )
+
+
+def print_confusion(result, class_names):
+    """Print per-class recall and the most common misclassification"""
+    confusion = np.array(result["confusion"])
+    print(f"\nPer-class results for {result['artifact']}:")
+    for i, class_name in enumerate(class_names):
+        total = confusion[i].sum()
+        if total == 0:
+            continue
+        errors = confusion[i].copy()
+        errors[i] = 0
+        confused = f"-> {class_names[int(np.argmax(errors))]} ({errors.max()})" if errors.any() else ""
+        print(f"   {class_name:<45} {confusion[i, i]:>5}/{total:<5} {confusion[i, i] / total:>7.2%} {confused}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare model artifacts for accuracy and speed regressions")
+    parser.add_argument("data_dir", help="Labelled image set, one folder per class")
+    parser.add_argument("artifacts", nargs="+", help="Model artifacts; the first one is the baseline")
+    parser.add_argument("--limit-per-class", type=int, default=None, help="Use at most N images per class")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed warmup predictions per artifact")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Timed passes per artifact; speed metrics are the median (default 3). "
+                             "Raise this on noisy machines, as the speed thresholds are tight")
+    parser.add_argument("--max-top1-drop", type=float, default=0.01, help="Allowed absolute top-1 drop (default 0.01)")
+    parser.add_argument("--max-top3-drop", type=float, default=0.01, help="Allowed absolute top-3 drop (default 0.01)")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.10, help="Allowed relative images/sec drop (default 0.10)")
+    parser.add_argument("--max-latency-increase", type=float, default=0.10, help="Allowed relative p95 latency increase (default 0.10)")
+    parser.add_argument("--max-memory-increase", type=float, default=0.20, help="Allowed relative peak memory increase (default 0.20)")
+    parser.add_argument("--json", dest="json_path", help="Also write full results (including confusion matrices) to this file")
+    args = parser.parse_args(argv)
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # utils.predict only imports TensorFlow inside load_model_once, so this stays cheap
+    from utils.predict import get_supported_classes
+    class_names = get_supported_classes()
+
+    print("Model Artifact Regression Harness")
+    print("=" * 50)
+
+    samples = load_dataset(args.data_dir, class_names, args.limit_per_class)
+    if not samples:
+        print(f"❌ No labelled images found in {args.data_dir}")
+        return False
+    print(f"Loaded {len(samples)} images from {args.data_dir}\n")
+
+    results = []
+    for model_path in args.artifacts:
+        print(f"Evaluating {model_path}...")
+        results.append(run_isolated(model_path, samples, len(class_names), args.warmup, args.repeats))
+
+    print()
+    print_comparison(results)
+    for result in results:
+        print_confusion(result, class_names)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = results[0]
+    passed = True
+    print()
+    for candidate in results[1:]:
+        failures = check_regressions(baseline, candidate, args)
+        if failures:
+            passed = False
+            print(f"❌ {candidate['artifact']} regressed against {baseline['artifact']}:")
+            for failure in failures:
+                print(f"   - {failure}")
+        else:
+            print(f"✅ {candidate['artifact']} is within thresholds")
+
+    return passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
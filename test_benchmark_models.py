@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the model artifact regression harness (uses a stub artifact,
+so neither TensorFlow nor a real model file is needed)
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import benchmark_models
+from utils.predict import get_supported_classes, NUM_CLASSES
+
+CLASS_NAMES = get_supported_classes()
+
+# Default thresholds from benchmark_models.parse_args
+THRESHOLDS = argparse.Namespace(
+    max_top1_drop=0.01,
+    max_top3_drop=0.01,
+    max_throughput_drop=0.10,
+    max_latency_increase=0.10,
+    max_memory_increase=0.20
+)
+
+
+def make_result(artifact, top1=0.9, top3=0.99, images_per_sec=100.0, p95_ms=10.0, peak_memory_mb=1000.0):
+    return {
+        "artifact": artifact,
+        "top1": top1,
+        "top3": top3,
+        "images_per_sec": images_per_sec,
+        "p95_ms": p95_ms,
+        "peak_memory_mb": peak_memory_mb
+    }
+
+
+def write_image(path, brightness):
+    Image.new('RGB', (64, 64), color=(brightness, brightness, brightness)).save(path)
+
+
+def stub_artifact(model_path):
+    """Predicts class 0 for dark images and class 1 for bright ones, with class 2 as runner-up"""
+    def predict(img_array):
+        predictions = np.zeros(NUM_CLASSES, dtype=np.float32)
+        predictions[2] = 0.1
+        predictions[0 if img_array.mean() < 0.5 else 1] = 1.0
+        return predictions
+    return predict
+
+
+def test_thresholds_pass():
+    """A candidate within every threshold passes"""
+    baseline = make_result("baseline.h5")
+    candidate = make_result("candidate.tflite", top1=0.895, images_per_sec=95.0, p95_ms=10.5, peak_memory_mb=1100.0)
+    assert benchmark_models.check_regressions(baseline, candidate, THRESHOLDS) == []
+
+
+def test_thresholds_fail():
+    """Each metric past its threshold is reported"""
+    baseline = make_result("baseline.h5")
+    candidate = make_result("candidate.tflite", top1=0.85, top3=0.95, images_per_sec=80.0,
+                            p95_ms=12.0, peak_memory_mb=1300.0)
+    failures = benchmark_models.check_regressions(baseline, candidate, THRESHOLDS)
+    assert len(failures) == 5, failures
+    for metric in ("top-1", "top-3", "throughput", "p95 latency", "peak memory"):
+        assert any(f.startswith(metric) for f in failures), f"{metric} not reported in {failures}"
+
+
+def test_missing_memory_is_not_gated():
+    """Peak memory is skipped when a platform cannot measure it"""
+    baseline = make_result("baseline.h5", peak_memory_mb=None)
+    candidate = make_result("candidate.tflite", peak_memory_mb=5000.0)
+    assert benchmark_models.check_regressions(baseline, candidate, THRESHOLDS) == []
+
+
+def test_load_dataset_skips_unknown_folders():
+    """Only known class folders and image files are collected"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        known = os.path.join(data_dir, CLASS_NAMES[1])
+        os.makedirs(known)
+        os.makedirs(os.path.join(data_dir, "Not_a_class"))
+        write_image(os.path.join(known, "a.png"), 200)
+        write_image(os.path.join(known, "b.PNG"), 200)
+        write_image(os.path.join(data_dir, "Not_a_class", "c.png"), 200)
+        with open(os.path.join(known, "notes.txt"), "w") as f:
+            f.write("not an image")
+
+        samples = benchmark_models.load_dataset(data_dir, CLASS_NAMES)
+        assert [(os.path.basename(path), label) for path, label in samples] == [("a.png", 1), ("b.PNG", 1)]
+        assert len(benchmark_models.load_dataset(data_dir, CLASS_NAMES, limit_per_class=1)) == 1
+
+
+def test_empty_dataset_fails():
+    """main() fails without evaluating anything when no labelled images exist"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.makedirs(os.path.join(data_dir, "Not_a_class"))
+        assert benchmark_models.main([data_dir, "baseline.h5"]) is False
+
+
+def test_evaluate_artifact_metrics():
+    """Accuracy, confusion and speed metrics from a stub artifact over repeated passes"""
+    load_artifact = benchmark_models.load_artifact
+    benchmark_models.load_artifact = stub_artifact
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            samples = []
+            for label, brightness in ((0, 10), (1, 240), (2, 240)):
+                path = os.path.join(data_dir, f"{label}.png")
+                write_image(path, brightness)
+                samples.append((path, label))
+
+            result = benchmark_models.evaluate_artifact("stub", samples, NUM_CLASSES, warmup=1, repeats=3)
+    finally:
+        benchmark_models.load_artifact = load_artifact
+
+    confusion = np.array(result["confusion"])
+    assert confusion.sum() == 3, "confusion must count the first pass only"
+    assert confusion[0, 0] == 1 and confusion[1, 1] == 1 and confusion[2, 1] == 1
+    assert abs(result["top1"] - 2 / 3) < 1e-9
+    assert result["top3"] == 1.0
+    assert result["repeats"] == 3
+    assert result["images_per_sec"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def run_all():
+    print("Testing Model Artifact Regression Harness")
+    print("=" * 50)
+
+    tests = [
+        test_thresholds_pass,
+        test_thresholds_fail,
+        test_missing_memory_is_not_gated,
+        test_load_dataset_skips_unknown_folders,
+        test_empty_dataset_fails,
+        test_evaluate_artifact_metrics
+    ]
+    passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except Exception as e:
+            passed = False
+            print(f"   ❌ {test.__name__}: {e}")
+    return passed
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
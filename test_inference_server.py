@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared-memory inference server (runs serve() with a stub model,
+so neither TensorFlow nor the real model file is needed)
+"""
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import itertools
+import subprocess
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils import inference_server
+from utils.inference_client import InferenceClient, ring_size, MESSAGE
+
+# Marker values placed in the first pixel to steer the stub model
+FAIL = -1.0
+SLOW = -2.0
+
+INPUT_SHAPE = inference_server.INPUT_SHAPE
+NUM_CLASSES = inference_server.NUM_CLASSES
+
+_ctx = multiprocessing.get_context("fork")
+
+# Sockets and stub output live here; removed when the script exits
+_socket_dir = tempfile.TemporaryDirectory(prefix="inference-")
+_socket_ids = itertools.count(1)
+
+
+# Runs in a separate interpreter (its own shared memory resource tracker), like a real deployment.
+# Self-contained so the server never imports this module and its temporary directory.
+SERVER_SCRIPT = f"""
+import sys
+import time
+import numpy as np
+from utils import inference_server
+
+class StubModel:
+    \"\"\"Predicts the class stored in the first pixel; FAIL raises, SLOW sleeps 1.5s\"\"\"
+    input_shape = (None,) + inference_server.INPUT_SHAPE
+    output_shape = (None, inference_server.NUM_CLASSES)
+
+    def __init__(self, max_batch_path):
+        self.max_batch_path = max_batch_path
+        self.max_batch = 0
+
+    def predict_on_batch(self, batch):
+        if len(batch) > self.max_batch:
+            self.max_batch = len(batch)
+            with open(self.max_batch_path, "w") as f:
+                f.write(str(self.max_batch))
+        markers = batch[:, 0, 0, 0]
+        if (markers == {FAIL}).any():
+            raise ValueError("stub failure")
+        if (markers == {SLOW}).any():
+            time.sleep(1.5)
+        predictions = np.zeros((len(batch), inference_server.NUM_CLASSES), dtype=np.float32)
+        for i, marker in enumerate(markers):
+            if marker >= 0:
+                predictions[i, int(marker)] = 1.0
+        return predictions
+
+inference_server.load_model_once = lambda: StubModel(sys.argv[2])
+inference_server.BATCH_WAIT_MS = 50  # Wide window so concurrent requests share a batch
+inference_server.HANDSHAKE_TIMEOUT = 0.5
+inference_server.serve(sys.argv[1])
+"""
+
+
+def start_server(socket_path):
+    """Start the server with a stub model and wait until its socket exists"""
+    max_batch_path = socket_path + ".max_batch"
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, socket_path, max_batch_path],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        if os.path.exists(socket_path):
+            time.sleep(0.1)  # Socket is bound; give listen() a moment
+            return process, max_batch_path
+        time.sleep(0.05)
+    process.terminate()
+    raise AssertionError("inference server did not start")
+
+
+def stop_server(process):
+    process.terminate()
+    process.wait()
+
+
+def read_max_batch(max_batch_path):
+    with open(max_batch_path) as f:
+        return int(f.read())
+
+
+def make_image(value):
+    """A (1, H, W, 3) tensor whose first pixel carries the class or marker"""
+    img_array = np.zeros((1,) + INPUT_SHAPE, dtype=np.float32)
+    img_array[0, 0, 0, 0] = value
+    return img_array
+
+
+def socket_path():
+    return os.path.join(_socket_dir.name, f"server-{next(_socket_ids)}.sock")
+
+
+def test_handshake():
+    """Client learns model shapes from the server"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path)
+    try:
+        info = client.get_server_info()
+        assert tuple(info["input_shape"]) == INPUT_SHAPE
+        assert info["num_classes"] == NUM_CLASSES
+        assert tuple(info["model_output_shape"]) == (None, NUM_CLASSES)
+        assert int(np.argmax(client.predict(make_image(3)))) == 3
+    finally:
+        client.close()
+        stop_server(process)
+
+
+def _worker(path, label, results):
+    client = InferenceClient(path)
+    answers = []
+    threads = [
+        threading.Thread(target=lambda: answers.append(int(np.argmax(client.predict(make_image(label))))))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+    results.put((label, answers))
+
+
+def test_batching_across_processes():
+    """Concurrent requests from several worker processes are answered correctly and batched"""
+    path = socket_path()
+    process, max_batch_path = start_server(path)
+    results = _ctx.Queue()
+    workers = [_ctx.Process(target=_worker, args=(path, label, results)) for label in (2, 5, 9)]
+    try:
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            label, answers = results.get(timeout=20)
+            assert answers == [label] * 4, f"worker {label} got {answers}"
+        for worker in workers:
+            worker.join()
+        assert read_max_batch(max_batch_path) > 1, "requests were never batched together"
+    finally:
+        stop_server(process)
+
+
+def test_reconnect_after_restart():
+    """A restarted server is picked up by the next request"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path, timeout=5)
+    try:
+        assert int(np.argmax(client.predict(make_image(1)))) == 1
+        stop_server(process)
+        try:
+            client.predict(make_image(1))
+            raise AssertionError("predict succeeded with the server down")
+        except AssertionError:
+            raise
+        except Exception:
+            pass
+
+        os.unlink(path)
+        process, _ = start_server(path)
+        assert int(np.argmax(client.predict(make_image(4)))) == 4
+    finally:
+        client.close()
+        stop_server(process)
+
+
+def test_timeout_does_not_leak_late_reply():
+    """After a timeout the late reply must not answer the next request"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path, slots=1, timeout=1)
+    try:
+        try:
+            client.predict(make_image(SLOW))
+            raise AssertionError("slow request did not time out")
+        except AssertionError:
+            raise
+        except Exception as e:
+            assert "timed out" in str(e)
+
+        predictions = client.predict(make_image(7))
+        assert int(np.argmax(predictions)) == 7 and predictions[7] == 1.0, f"got {predictions}"
+    finally:
+        client.close()
+        stop_server(process)
+
+
+def test_error_status_frees_slot():
+    """Model failures are reported and do not use up the ring's slots"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path, slots=2, timeout=3)
+    try:
+        for _ in range(3):
+            try:
+                client.predict(make_image(FAIL))
+                raise AssertionError("failing request did not raise")
+            except AssertionError:
+                raise
+            except Exception as e:
+                assert "failed to run the model" in str(e), f"unexpected error: {e}"
+        assert int(np.argmax(client.predict(make_image(6)))) == 6
+    finally:
+        client.close()
+        stop_server(process)
+
+
+def test_connection_lost_is_reported():
+    """A server dying mid-request is reported as a lost connection, not a model failure"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path, timeout=5)
+    errors = []
+
+    def slow_request():
+        try:
+            client.predict(make_image(SLOW))
+        except Exception as e:
+            errors.append(str(e))
+
+    try:
+        thread = threading.Thread(target=slow_request)
+        thread.start()
+        time.sleep(0.5)
+        stop_server(process)
+        thread.join()
+        assert errors == ["Inference server connection lost"], f"got {errors}"
+    finally:
+        client.close()
+
+
+def test_bad_input_frees_slot():
+    """A wrongly shaped image fails without using up the ring's slots"""
+    path = socket_path()
+    process, _ = start_server(path)
+    client = InferenceClient(path, slots=1, timeout=1)
+    try:
+        for _ in range(2):
+            try:
+                client.predict(np.zeros((1, 4, 4, 3), dtype=np.float32))
+                raise AssertionError("wrongly shaped image was accepted")
+            except ValueError:
+                pass
+        assert int(np.argmax(client.predict(make_image(8)))) == 8
+    finally:
+        client.close()
+        stop_server(process)
+
+
+def test_handshake_closed_by_server():
+    """A server that hangs up during the handshake gives a clear error"""
+    path = socket_path()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+
+    def hang_up():
+        sock, _ = listener.accept()
+        sock.close()
+
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    try:
+        InferenceClient(path, timeout=2).get_server_info()
+        raise AssertionError("handshake succeeded against a closed connection")
+    except AssertionError:
+        raise
+    except Exception as e:
+        assert "closed the connection during handshake" in str(e), f"unexpected error: {e}"
+    finally:
+        thread.join()
+        listener.close()
+
+
+def _raw_handshake(path, request_line):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    sock.connect(path)
+    reader = sock.makefile("rb")
+    reader.readline()
+    sock.sendall(request_line)
+    return sock, reader, json.loads(reader.readline())
+
+
+def test_bad_handshake_and_slot():
+    """Malformed handshakes get an error reply and invalid slots drop the connection"""
+    path = socket_path()
+    process, _ = start_server(path)
+    shm = shared_memory.SharedMemory(create=True, size=ring_size(1, INPUT_SHAPE, NUM_CLASSES))
+    try:
+        for request_line in (b"not json\n", b'{"shm": "x", "slots": "many"}\n', b"5\n"):
+            sock, reader, reply = _raw_handshake(path, request_line)
+            assert reply["ok"] is False and reply["error"], f"{request_line!r} got {reply}"
+            reader.close()
+            sock.close()
+
+        sock, reader, reply = _raw_handshake(path, json.dumps({"shm": shm.name, "slots": 1}).encode() + b"\n")
+        assert reply["ok"] is True
+        sock.sendall(MESSAGE.pack(5, 0))
+        assert reader.read(MESSAGE.size) == b"", "server kept a connection that sent an invalid slot"
+        reader.close()
+        sock.close()
+
+        # A client that never sends its handshake is dropped after HANDSHAKE_TIMEOUT
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect(path)
+        reader = sock.makefile("rb")
+        reader.readline()
+        reply = json.loads(reader.readline())
+        assert reply["ok"] is False, f"idle client got {reply}"
+        assert reader.read(1) == b"", "server kept an idle connection open"
+        reader.close()
+        sock.close()
+    finally:
+        shm.close()
+        shm.unlink()
+        stop_server(process)
+
+
+def run_all():
+    print("Testing Shared-Memory Inference Server")
+    print("=" * 50)
+
+    tests = [
+        test_handshake,
+        test_batching_across_processes,
+        test_reconnect_after_restart,
+        test_timeout_does_not_leak_late_reply,
+        test_error_status_frees_slot,
+        test_connection_lost_is_reported,
+        test_bad_input_frees_slot,
+        test_handshake_closed_by_server,
+        test_bad_handshake_and_slot
+    ]
+    passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except Exception as e:
+            passed = False
+            print(f"   ❌ {test.__name__}: {e}")
+    return passed
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the profiling session lifecycle (no model or server needed)
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+from utils import predict, profiling
+from utils.profiling import start_profiling, stop_profiling, get_profiling_status, profile_request, span
+
+# Keep test output out of the real profiles/ directory; removed when the script exits
+_profile_dir = tempfile.TemporaryDirectory(prefix="profiles-")
+os.environ["PROFILE_DIR"] = _profile_dir.name
+
+
+def fake_request():
+    """Stand-in for one /predict call with a preprocessing and a predict phase"""
+    with profile_request():
+        with span("preprocess_image"):
+            sum(i * i for i in range(200000))
+        with span("model.predict"):
+            time.sleep(0.02)
+
+
+def wait_until_inactive(timeout=5):
+    deadline = time.time() + timeout
+    while get_profiling_status()["active"] and time.time() < deadline:
+        time.sleep(0.01)
+    return get_profiling_status()
+
+
+def test_request_limit():
+    """Session ends after N requests and writes both output files from the profiler thread"""
+    writer_threads = []
+    write_output = profiling._ProfileSession.write_output
+
+    def recording_write_output(session):
+        writer_threads.append(threading.current_thread().name)
+        return write_output(session)
+
+    profiling._ProfileSession.write_output = recording_write_output
+    try:
+        start_profiling(mode="sample", requests=2)
+        fake_request()
+        assert get_profiling_status()["active"], "session ended too early"
+        fake_request()
+        status = wait_until_inactive()
+    finally:
+        profiling._ProfileSession.write_output = write_output
+
+    assert not status["active"], "session did not end after the request limit"
+    assert writer_threads == ["profiler"], f"output written on {writer_threads}"
+    result = status["last_result"]
+    assert result["reason"] == "request limit reached"
+    assert result["requests_profiled"] == 2
+    assert result["pid"] == os.getpid()
+    assert result["output_dir"].startswith(_profile_dir.name)
+
+    trace_path = os.path.join(result["output_dir"], "requests.trace.json")
+    folded_path = os.path.join(result["output_dir"], "stacks.folded")
+    assert sorted(result["files"]) == sorted([trace_path, folded_path])
+
+    with open(trace_path) as f:
+        names = [event["name"] for event in json.load(f)["traceEvents"]]
+    assert names.count("request") == 2
+    assert names.count("preprocess_image") == 2
+    assert names.count("model.predict") == 2
+
+    with open(folded_path) as f:
+        lines = f.read().splitlines()
+    assert lines, "no stack samples recorded"
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_time_limit():
+    """Session ends on its own once the time limit passes"""
+    start_profiling(mode="sample", seconds=0.2)
+    status = wait_until_inactive()
+    assert not status["active"], "session did not end after the time limit"
+    assert status["last_result"]["reason"] == "time limit reached"
+
+
+def test_stop_and_no_op():
+    """Admin stop works and hooks are shared no-ops when profiling is off"""
+    start_profiling(mode="sample", requests=5)
+    result = stop_profiling()
+    assert result["reason"] == "stopped by admin"
+    assert stop_profiling() is None
+    assert profile_request() is profiling._NULL_CONTEXT
+    assert span("model.predict") is profiling._NULL_CONTEXT
+
+
+def test_argument_validation():
+    """Bad arguments raise ValueError and a second session is refused"""
+    for kwargs in ({"mode": "bogus"}, {"requests": 0}, {"requests": [1]},
+                   {"seconds": "soon"}, {"seconds": 10000}):
+        try:
+            start_profiling(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"start_profiling({kwargs}) did not raise ValueError")
+
+    start_profiling(mode="sample", requests=1)
+    try:
+        start_profiling(mode="sample", requests=1)
+        raise AssertionError("second session was allowed to start")
+    except profiling.ProfilingActiveError:
+        pass
+    finally:
+        stop_profiling()
+
+
+def test_tensorflow_mode_with_inference_server():
+    """tensorflow mode is refused when the model lives in the inference server"""
+    predict.INFERENCE_SOCKET = "/tmp/plant-disease-inference.sock"
+    try:
+        start_profiling(mode="tensorflow", requests=1)
+        stop_profiling()
+        raise AssertionError("tensorflow mode was allowed with INFERENCE_SOCKET set")
+    except ValueError:
+        pass
+    finally:
+        predict.INFERENCE_SOCKET = ""
+    assert "tensorflow" not in sys.modules
+
+
+def run_all():
+    print("Testing Inference Profiling")
+    print("=" * 50)
+
+    tests = [
+        test_request_limit,
+        test_time_limit,
+        test_stop_and_no_op,
+        test_argument_validation,
+        test_tensorflow_mode_with_inference_server
+    ]
+    passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except Exception as e:
+            passed = False
+            print(f"   ❌ {test.__name__}: {e}")
+            stop_profiling()
+    return passed
+
+
+if __name__ == "__main__":
+    success = run_all()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,246 @@
+import os
+import json
+import atexit
+import queue
+import socket
+import struct
+import threading
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Client defaults; INFERENCE_SLOTS and INFERENCE_TIMEOUT are read when a client is created
+DEFAULT_SLOTS = 8  # Request slots in each web worker's shared memory ring buffer
+DEFAULT_TIMEOUT = 30.0  # Seconds to wait for a free slot or for the server to answer
+
+# Control channel message: slot index and status (pixel data never goes over the socket)
+MESSAGE = struct.Struct("!Ii")
+STATUS_OK = 0
+STATUS_ERROR = 1
+# Client-side only, never sent: the connection dropped before the server answered
+STATUS_DISCONNECTED = -1
+
+# Global client instance for reuse
+_client = None
+_client_lock = threading.Lock()
+
+
+def slot_views(buf, slots, input_shape, num_classes):
+    """
+    Split a shared memory buffer into per-slot (input, output) float32 arrays.
+    Each slot holds one preprocessed image followed by its class probabilities.
+    """
+    input_size = int(np.prod(input_shape))
+    slot_size = (input_size + num_classes) * 4
+    views = []
+    for slot in range(slots):
+        offset = slot * slot_size
+        input_view = np.ndarray(input_shape, dtype=np.float32, buffer=buf, offset=offset)
+        output_view = np.ndarray((num_classes,), dtype=np.float32, buffer=buf, offset=offset + input_size * 4)
+        views.append((input_view, output_view))
+    return views
+
+
+def ring_size(slots, input_shape, num_classes):
+    """Bytes needed for a ring buffer of `slots` slots"""
+    return slots * (int(np.prod(input_shape)) + num_classes) * 4
+
+
+class InferenceClient:
+    """Web worker side of the inference server: owns a shared memory ring and a socket"""
+
+    def __init__(self, socket_path, slots=None, timeout=None):
+        self.socket_path = socket_path
+        self.slots = slots if slots is not None else int(os.getenv("INFERENCE_SLOTS", DEFAULT_SLOTS))
+        self.timeout = timeout if timeout is not None else float(os.getenv("INFERENCE_TIMEOUT", DEFAULT_TIMEOUT))
+        self.info = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pid = None
+        self._sock = None
+        self._reader = None
+        self._shm = None
+        self._views = None
+        self._free = None
+        self._pending = {}
+
+    def _connect(self):
+        """Handshake with the server and hand it our ring buffer"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        reader = None
+        shm = None
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            reader = sock.makefile("rb")
+
+            info = json.loads(self._read_handshake_line(reader))
+            input_shape = tuple(info["input_shape"])
+            num_classes = info["num_classes"]
+
+            shm = shared_memory.SharedMemory(create=True, size=ring_size(self.slots, input_shape, num_classes))
+            sock.sendall(json.dumps({"shm": shm.name, "slots": self.slots}).encode() + b"\n")
+            reply = json.loads(self._read_handshake_line(reader))
+            if not reply.get("ok"):
+                raise Exception(reply.get("error", "handshake rejected"))
+        except Exception:
+            if reader is not None:
+                reader.close()
+            sock.close()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            raise
+
+        sock.settimeout(None)
+        # Each connection gets its own pending dict so a late reply on an old
+        # connection can never wake a request made on a newer one
+        pending = {}
+        self.info = info
+        self._sock = sock
+        self._reader = reader
+        self._shm = shm
+        self._views = slot_views(shm.buf, self.slots, input_shape, num_classes)
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._pending = pending
+        self._pid = os.getpid()
+
+        threading.Thread(target=self._read_replies, args=(sock, reader, pending), name="inference-client", daemon=True).start()
+        logger.info(f"Connected to inference server at {self.socket_path} with {self.slots} slots")
+
+    @staticmethod
+    def _read_handshake_line(reader):
+        line = reader.readline()
+        if not line:
+            raise Exception("Inference server closed the connection during handshake")
+        return line
+
+    def _ensure_connected(self):
+        """Connect if needed and return a consistent (sock, views, free, pending) snapshot"""
+        with self._lock:
+            # A forked worker must not share its parent's socket and ring buffer
+            if self._sock is None or self._pid != os.getpid():
+                self._sock = None
+                self._connect()
+            return self._sock, self._views, self._free, self._pending
+
+    def _read_replies(self, sock, reader, pending):
+        """Wake the request waiting on each slot as the server completes it"""
+        try:
+            while True:
+                data = reader.read(MESSAGE.size)
+                if len(data) < MESSAGE.size:
+                    break
+                slot, status = MESSAGE.unpack(data)
+                waiting = pending.get(slot)
+                if waiting is not None:
+                    waiting[1] = status
+                    waiting[0].set()
+        except (OSError, ValueError):
+            # ValueError: reader was closed by _disconnect from another thread
+            pass
+        finally:
+            logger.warning("Inference server connection closed")
+            self._disconnect(sock)
+
+    def _disconnect(self, sock):
+        """Drop a broken connection; waiting requests fail and the next one reconnects"""
+        with self._lock:
+            if self._sock is not sock:
+                return
+            self._sock = None
+            reader = self._reader
+            self._reader = None
+            shm = self._shm
+            self._shm = None
+            self._views = None
+            pending = self._pending
+            self._pending = {}
+
+        for event_and_status in pending.values():
+            event_and_status[1] = STATUS_DISCONNECTED
+            event_and_status[0].set()
+        # shutdown() really ends the connection even though the reader still
+        # references the socket; this stops our reader thread and the server side
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            reader.close()
+        except (OSError, ValueError):
+            pass
+        sock.close()
+        try:
+            shm.close()
+        except BufferError:
+            # A request thread still holds a view; the mapping is released when it finishes
+            pass
+        shm.unlink()
+
+    def close(self):
+        """Disconnect and release the ring buffer"""
+        sock = self._sock
+        if sock is not None and self._pid == os.getpid():
+            self._disconnect(sock)
+
+    def get_server_info(self):
+        """Return model details reported by the server during the handshake"""
+        self._ensure_connected()
+        return self.info
+
+    def predict(self, img_array):
+        """Run one preprocessed image (1, H, W, 3) through the server; returns class probabilities"""
+        sock, views, free, pending = self._ensure_connected()
+
+        try:
+            slot = free.get(timeout=self.timeout)
+        except queue.Empty:
+            raise Exception("No free inference slot (server overloaded)")
+
+        try:
+            input_view, output_view = views[slot]
+            input_view[...] = img_array.reshape(input_view.shape)
+            done = threading.Event()
+            pending[slot] = [done, None]
+            with self._send_lock:
+                sock.sendall(MESSAGE.pack(slot, 0))
+        except OSError as e:
+            self._disconnect(sock)
+            raise Exception(f"Inference server unavailable: {e}")
+        except Exception:
+            # Nothing reached the server (e.g. wrong image shape), so the slot is still ours
+            pending.pop(slot, None)
+            free.put(slot)
+            raise
+
+        if not done.wait(self.timeout):
+            # The server may still write into this slot, so the whole ring is abandoned
+            self._disconnect(sock)
+            raise Exception("Inference server timed out")
+
+        status = pending.pop(slot)[1]
+        try:
+            if status == STATUS_DISCONNECTED:
+                raise Exception("Inference server connection lost")
+            if status != STATUS_OK:
+                raise Exception("Inference server failed to run the model")
+            return output_view.copy()
+        finally:
+            # The server has answered, so the slot is safe to reuse either way
+            free.put(slot)
+
+
+def get_inference_client(socket_path):
+    """Return the process-wide client for the inference server at socket_path"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.socket_path != socket_path:
+            _client = InferenceClient(socket_path)
+            atexit.register(_client.close)
+    return _client
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local inference server that owns the TensorFlow model.
+
+Web workers (with INFERENCE_SOCKET set) connect over a Unix socket, share a
+ring buffer of request slots through multiprocessing.shared_memory, and send
+only slot indices over the socket. Requests from all workers are batched.
+
+Usage:
+    python -m utils.inference_server
+"""
+import os
+import json
+import queue
+import socket
+import threading
+import time
+import logging
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load .env before utils.predict reads MODEL_PATH and the settings below are read
+load_dotenv()
+
+from utils.predict import load_model_once, INPUT_SIZE, NUM_CLASSES
+from utils.inference_client import slot_views, ring_size, MESSAGE, STATUS_OK, STATUS_ERROR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Inference server configuration
+SOCKET_PATH = os.getenv("INFERENCE_SOCKET") or "/tmp/plant-disease-inference.sock"
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH", "32"))
+BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "2"))
+MAX_SLOTS = 1024
+HANDSHAKE_TIMEOUT = 10  # Seconds a new connection may take to send its ring buffer details
+
+INPUT_SHAPE = (INPUT_SIZE[0], INPUT_SIZE[1], 3)
+
+
+class _WorkerConnection:
+    """One connected web worker and its attached ring buffer"""
+
+    def __init__(self, sock, shm, views):
+        self.sock = sock
+        self.shm = shm
+        self.views = views
+        self.closed = False
+        self._send_lock = threading.Lock()
+
+    def reply(self, slot, status):
+        try:
+            with self._send_lock:
+                self.sock.sendall(MESSAGE.pack(slot, status))
+        except OSError:
+            self.closed = True
+
+    def close(self):
+        self.closed = True
+        self.views = None
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        try:
+            self.shm.close()
+        except BufferError:
+            # The batcher still holds a view; the mapping is released when it finishes
+            pass
+
+
+def _attach_ring(name, slots):
+    """Attach to a worker's ring buffer without taking ownership of it"""
+    shm = shared_memory.SharedMemory(name=name)
+    # The worker created the segment and unlinks it; stop our tracker from doing so at exit
+    resource_tracker.unregister(shm._name, "shared_memory")
+    if shm.size < ring_size(slots, INPUT_SHAPE, NUM_CLASSES):
+        shm.close()
+        raise ValueError(f"Shared memory segment {name} is too small for {slots} slots")
+    return shm
+
+
+def _handle_connection(sock, model, batch_queue):
+    """Handshake with a web worker, then queue each slot it submits"""
+    reader = sock.makefile("rb")
+    conn = None
+    try:
+        # A client that connects but never completes the handshake must not hold this thread
+        sock.settimeout(HANDSHAKE_TIMEOUT)
+        info = {
+            "input_shape": list(INPUT_SHAPE),
+            "num_classes": NUM_CLASSES,
+            "model_input_shape": list(model.input_shape),
+            "model_output_shape": list(model.output_shape)
+        }
+        sock.sendall(json.dumps(info).encode() + b"\n")
+
+        try:
+            request = json.loads(reader.readline())
+            slots = int(request["slots"])
+            if not 1 <= slots <= MAX_SLOTS:
+                raise ValueError(f"slots must be between 1 and {MAX_SLOTS}")
+            shm = _attach_ring(request["shm"], slots)
+        except Exception as e:
+            sock.sendall(json.dumps({"ok": False, "error": str(e)}).encode() + b"\n")
+            raise
+
+        conn = _WorkerConnection(sock, shm, slot_views(shm.buf, slots, INPUT_SHAPE, NUM_CLASSES))
+        sock.sendall(b'{"ok": true}\n')
+        sock.settimeout(None)
+        logger.info(f"Web worker connected with {slots} slots")
+
+        while True:
+            data = reader.read(MESSAGE.size)
+            if len(data) < MESSAGE.size:
+                break
+            slot, _ = MESSAGE.unpack(data)
+            if slot >= slots:
+                logger.error(f"Web worker sent invalid slot {slot}, disconnecting")
+                break
+            batch_queue.put((conn, slot))
+
+    except Exception as e:
+        logger.error(f"Web worker connection failed: {e}")
+    finally:
+        # Release the reader's reference first, otherwise close() leaves the socket open
+        reader.close()
+        if conn is not None:
+            conn.close()
+        else:
+            sock.close()
+        logger.info("Web worker disconnected")
+
+
+def _batch_loop(model, batch_queue):
+    """Collect requests from all workers into batches and run the model"""
+    batch_input = np.empty((MAX_BATCH_SIZE,) + INPUT_SHAPE, dtype=np.float32)
+    while True:
+        items = [batch_queue.get()]
+        deadline = time.monotonic() + BATCH_WAIT_MS / 1000
+        while len(items) < MAX_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(batch_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        # Copy inputs out of shared memory, skipping workers that went away
+        batch = []
+        for conn, slot in items:
+            views = conn.views
+            if conn.closed or views is None:
+                continue
+            batch_input[len(batch)] = views[slot][0]
+            batch.append((conn, slot, views))
+        if not batch:
+            continue
+
+        try:
+            predictions = np.asarray(model.predict_on_batch(batch_input[:len(batch)]))
+            status = STATUS_OK
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            status = STATUS_ERROR
+
+        for i, (conn, slot, views) in enumerate(batch):
+            if status == STATUS_OK:
+                views[slot][1][:] = predictions[i]
+            conn.reply(slot, status)
+
+
+def serve(socket_path=SOCKET_PATH):
+    """Load the model and serve web workers until interrupted"""
+    model = load_model_once()
+    batch_queue = queue.Queue()
+    threading.Thread(target=_batch_loop, args=(model, batch_queue), name="batcher", daemon=True).start()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o660)
+    server.listen()
+    logger.info(f"Inference server listening on {socket_path} (max batch {MAX_BATCH_SIZE}, wait {BATCH_WAIT_MS}ms)")
+
+    try:
+        while True:
+            sock, _ = server.accept()
+            threading.Thread(target=_handle_connection, args=(sock, model, batch_queue), daemon=True).start()
+    except KeyboardInterrupt:
+        logger.info("Inference server shutting down")
+    finally:
+        server.close()
+        os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    serve()
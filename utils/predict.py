@@ -1,10 +1,10 @@
 import os
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
+from PIL import Image
 from io import BytesIO
-import tensorflow as tf
 import logging
+from utils.profiling import span
+from utils.inference_client import get_inference_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +13,10 @@ logger = logging.getLogger(__name__)
 # Load model path from .env
 MODEL_PATH = os.getenv("MODEL_PATH", "model/plant_disease_model.h5")
 
+# When set, predictions go to the inference server on this Unix socket
+# (python -m utils.inference_server) and TensorFlow is never imported here
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+
 # Class index to label mapping (MUST match training order)
 # This list MUST be exactly 15 classes in the same order as model training
 CLASS_NAMES = [
@@ -45,6 +49,9 @@ def load_model_once():
     global _model
     if _model is None:
         try:
+            # Imported lazily so web workers using the inference server skip TensorFlow
+            from tensorflow.keras.models import load_model
+            
             logger.info(f"Loading model from {MODEL_PATH}")
             _model = load_model(MODEL_PATH, compile=False)
             logger.info("Model loaded successfully")
@@ -66,11 +73,16 @@ def preprocess_image(img_file):
         img_file.seek(0)
         
         # Load image with exact target size expected by model
-        img_stream = BytesIO(img_file.read())
-        img = image.load_img(img_stream, target_size=INPUT_SIZE)
+        # (same steps as keras load_img: RGB conversion, nearest-neighbour resize)
+        img = Image.open(BytesIO(img_file.read()))
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        width_height = (INPUT_SIZE[1], INPUT_SIZE[0])
+        if img.size != width_height:
+            img = img.resize(width_height, Image.NEAREST)
         
         # Convert to array and normalize
-        img_array = image.img_to_array(img)
+        img_array = np.asarray(img, dtype=np.float32)
         img_array = np.expand_dims(img_array, axis=0)
         img_array = img_array / 255.0  # Normalize to [0,1]
         
@@ -107,14 +119,19 @@ def load_model_and_predict(img_file):
     Returns consistent prediction format
     """
     try:
-        # Load model (cached after first load)
-        model = load_model_once()
+        # Load model (cached after first load) unless the inference server owns it
+        model = None if INFERENCE_SOCKET else load_model_once()
         
         # Preprocess image
-        img_array = preprocess_image(img_file)
+        with span("preprocess_image"):
+            img_array = preprocess_image(img_file)
         
         # Make prediction
-        predictions = model.predict(img_array, verbose=0)[0]
+        with span("model.predict"):
+            if model is None:
+                predictions = get_inference_client(INFERENCE_SOCKET).predict(img_array)
+            else:
+                predictions = model.predict(img_array, verbose=0)[0]
         
         # Get top prediction
         class_index = np.argmax(predictions)
@@ -164,17 +181,24 @@ def get_supported_classes():
 def validate_model():
     """Validate that the model is properly loaded and configured"""
     try:
-        model = load_model_once()
+        if INFERENCE_SOCKET:
+            info = get_inference_client(INFERENCE_SOCKET).get_server_info()
+            input_shape = tuple(info["model_input_shape"])
+            output_shape = tuple(info["model_output_shape"])
+        else:
+            model = load_model_once()
+            input_shape = model.input_shape
+            output_shape = model.output_shape
         
         # Check input shape
         expected_input_shape = (None, INPUT_SIZE[0], INPUT_SIZE[1], 3)
-        if model.input_shape != expected_input_shape:
-            logger.warning(f"Model input shape {model.input_shape} doesn't match expected {expected_input_shape}")
+        if input_shape != expected_input_shape:
+            logger.warning(f"Model input shape {input_shape} doesn't match expected {expected_input_shape}")
         
         # Check output shape
         expected_output_shape = (None, NUM_CLASSES)
-        if model.output_shape != expected_output_shape:
-            raise ValueError(f"Model output shape {model.output_shape} doesn't match expected {expected_output_shape}")
+        if output_shape != expected_output_shape:
+            raise ValueError(f"Model output shape {output_shape} doesn't match expected {expected_output_shape}")
         
         logger.info("Model validation successful")
         return True
@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import threading
+import itertools
+import logging
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Profiling configuration constants
+# PROFILE_DIR and PROFILE_SAMPLE_INTERVAL are read when a session starts, so .env values apply
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_SAMPLE_INTERVAL = 0.005  # Stack sampler interval in seconds
+PROFILE_MODES = ("sample", "tensorflow")
+DEFAULT_PROFILE_REQUESTS = 10
+MAX_PROFILE_REQUESTS = 1000
+MAX_PROFILE_SECONDS = 300  # Hard cap so a forgotten session always ends
+
+# Active session (None when profiling is off) and result of the last one
+_session = None
+_last_result = None
+_lock = threading.Lock()
+_session_ids = itertools.count(1)
+
+# Shared no-op context returned on the fast path when profiling is off
+_NULL_CONTEXT = nullcontext()
+
+
+class ProfilingActiveError(Exception):
+    """Raised when starting a session while another one is running"""
+
+
+class _ProfileSession:
+    """A single profiling window covering the next N requests or T seconds"""
+
+    def __init__(self, mode, max_requests, max_seconds):
+        self.mode = mode
+        self.max_requests = max_requests
+        self.remaining = max_requests
+        self.started_at = time.time()
+        self.deadline = self.started_at + max_seconds
+        self.sample_interval = float(os.getenv("PROFILE_SAMPLE_INTERVAL", DEFAULT_SAMPLE_INTERVAL))
+        self.output_dir = os.path.join(
+            os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR), f"{mode}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_session_ids)}"
+        )
+        self.active_threads = set()
+        self.requests_profiled = 0
+        self.stacks = Counter()
+        self.samples = 0
+        self.events = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._limit_reached = False
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.mode == "tensorflow":
+            import tensorflow as tf
+            tf.profiler.experimental.start(self.output_dir)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+        if self.mode == "tensorflow":
+            import tensorflow as tf
+            tf.profiler.experimental.stop()
+
+    def _run(self):
+        """
+        Background loop: take stack samples and end the session on either limit.
+        Finishing here keeps output writing off the thread serving the last request.
+        """
+        interval = self.sample_interval if self.mode == "sample" else 0.25
+        while True:
+            self._wake.wait(interval)
+            if self._stop.is_set():
+                return
+            if self._limit_reached:
+                _finish(self, "request limit reached")
+                return
+            if time.time() >= self.deadline:
+                _finish(self, "time limit reached")
+                return
+            if self.mode == "sample":
+                self._sample()
+
+    def _sample(self):
+        """Record the current stack of every thread serving a profiled request"""
+        frames = sys._current_frames()
+        for ident in list(self.active_threads):
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def _add_event(self, name, start, end, ident):
+        self.events.append({
+            "name": name,
+            "ph": "X",
+            "ts": round(start * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": ident
+        })
+
+    @contextmanager
+    def request(self):
+        with _lock:
+            claimed = self.remaining > 0 and _session is self
+            if claimed:
+                self.remaining -= 1
+        if not claimed:
+            yield
+            return
+
+        ident = threading.get_ident()
+        self.active_threads.add(ident)
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._add_event("request", start, time.time(), ident)
+            with _lock:
+                self.active_threads.discard(ident)
+                self.requests_profiled += 1
+                done = self.remaining == 0 and not self.active_threads
+            if done:
+                # Let the profiler thread stop and write output after the response is sent
+                self._limit_reached = True
+                self._wake.set()
+
+    @contextmanager
+    def span(self, name):
+        trace = None
+        if self.mode == "tensorflow":
+            import tensorflow as tf
+            trace = tf.profiler.experimental.Trace(name)
+            trace.__enter__()
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._add_event(name, start, time.time(), threading.get_ident())
+            if trace is not None:
+                trace.__exit__(None, None, None)
+
+    def write_output(self):
+        """Write Chrome trace of request phases and folded stacks for flamegraphs"""
+        files = []
+
+        trace_path = os.path.join(self.output_dir, "requests.trace.json")
+        with open(trace_path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        files.append(trace_path)
+
+        if self.mode == "sample":
+            folded_path = os.path.join(self.output_dir, "stacks.folded")
+            with open(folded_path, "w") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            files.append(folded_path)
+
+        return files
+
+    def status(self):
+        return {
+            "mode": self.mode,
+            "requests_profiled": self.requests_profiled,
+            "remaining_requests": self.remaining,
+            "seconds_left": max(0.0, round(self.deadline - time.time(), 1)),
+            "output_dir": self.output_dir,
+            "pid": os.getpid()
+        }
+
+
+def _finish(session, reason):
+    """Stop a session (once) and write its output files"""
+    global _session, _last_result
+    with _lock:
+        if _session is not session:
+            return _last_result
+        _session = None
+
+    session.stop()
+    try:
+        files = session.write_output()
+    except Exception as e:
+        logger.error(f"Failed to write profile output: {e}")
+        files = []
+
+    result = session.status()
+    result.update({
+        "reason": reason,
+        "duration_seconds": round(time.time() - session.started_at, 3),
+        "samples": session.samples,
+        "files": files
+    })
+    _last_result = result
+    logger.info(f"Profiling stopped ({reason}), output written to {session.output_dir}")
+    return result
+
+
+def start_profiling(mode="sample", requests=None, seconds=None):
+    """
+    Start profiling the next `requests` predictions or the next `seconds` seconds,
+    whichever comes first. Raises ValueError for bad arguments and
+    ProfilingActiveError if a session is already running.
+    """
+    global _session
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiling mode '{mode}', expected one of {PROFILE_MODES}")
+    # Imported here because utils.predict imports this module; reading its setting keeps
+    # this check in line with how predictions are actually routed
+    from utils import predict
+    if mode == "tensorflow" and predict.INFERENCE_SOCKET:
+        # The model runs in the inference server, and web workers must not import TensorFlow
+        raise ValueError("tensorflow mode is unavailable when INFERENCE_SOCKET is set; use sample mode")
+
+    if requests is None and seconds is None:
+        requests = DEFAULT_PROFILE_REQUESTS
+    try:
+        requests = MAX_PROFILE_REQUESTS if requests is None else int(requests)
+        seconds = MAX_PROFILE_SECONDS if seconds is None else float(seconds)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("requests and seconds must be numbers")
+    if not 1 <= requests <= MAX_PROFILE_REQUESTS:
+        raise ValueError(f"requests must be between 1 and {MAX_PROFILE_REQUESTS}")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ValueError(f"seconds must be between 0 and {MAX_PROFILE_SECONDS}")
+
+    with _lock:
+        if _session is not None:
+            raise ProfilingActiveError("A profiling session is already running")
+        session = _ProfileSession(mode, requests, seconds)
+        session.start()
+        _session = session
+
+    logger.info(f"Profiling started: mode={mode}, requests={requests}, seconds={seconds}")
+    return session.status()
+
+
+def stop_profiling(reason="stopped by admin"):
+    """Stop the running session early; returns its result or None if none was running"""
+    session = _session
+    if session is None:
+        return None
+    return _finish(session, reason)
+
+
+def get_profiling_status():
+    """Return the active session status and the result of the last finished session"""
+    session = _session
+    return {
+        # Sessions are per process: with several web workers, each is profiled separately
+        "pid": os.getpid(),
+        "active": session is not None,
+        "session": session.status() if session is not None else None,
+        "last_result": _last_result
+    }
+
+
+def profile_request():
+    """Context manager wrapping one prediction request; a shared no-op when profiling is off"""
+    session = _session
+    if session is None:
+        return _NULL_CONTEXT
+    return session.request()
+
+
+def span(name):
+    """Context manager timing one phase of a profiled request; a shared no-op otherwise"""
+    session = _session
+    if session is None or threading.get_ident() not in session.active_threads:
+        return _NULL_CONTEXT
+    return session.span(name)